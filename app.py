@@ -1,7 +1,24 @@
+# Patch the standard library for gevent before anything imports socket, ssl or smtplib,
+# so blocking network calls yield to other greenlets when served by gunicorn_conf.py.
+try:
+    from gevent import monkey
+    monkey.patch_all()
+except ImportError:
+    pass # gevent is optional; without it the app runs on plain threads
+
 from flask import Flask, jsonify, request, render_template
 import os
 import werkzeug.utils
 import csv # For logging and reading stats
+import re # For validating email addresses
+import functools # For caching the /view-data parse
+import threading # For serializing log writes from worker threads
+import atexit # For closing the log file on shutdown
+import itertools # For putting back the first streamed contact
+import io # For parsing single log records
+import json # For the /stats checkpoint file
+import tempfile # For the /stats checkpoint file and unique upload names
+import queue # For handing work between the stages of the send pipeline
 from datetime import datetime # For timestamping logs
 
 # Import settings from config.py, assuming it's in the same directory (root)
@@ -16,37 +33,46 @@ except ImportError:
         CSV_FILE_PATH = 'export_50.csv' # Default path
         GEMINI_API_KEY = None
         SMTP_HOST = None
+        EMAIL_WORKERS = 8
     settings = DummySettings()
 
 # Dummy/fallback imports
 try:
-    from excel_processor import extract_data_from_csv
-    print("Successfully imported extract_data_from_csv from excel_processor.")
+    from excel_processor import extract_data_from_csv, iter_data_from_csv
+    print("Successfully imported extract_data_from_csv and iter_data_from_csv from excel_processor.")
 except ImportError:
-    print("Warning: excel_processor.py not found. Using dummy extract_data_from_csv.")
+    print("Warning: excel_processor.py not found. Using dummy extract_data_from_csv and iter_data_from_csv.")
     def extract_data_from_csv(file_path, **kwargs):
         print(f"Dummy excel_processor.extract_data_from_csv called for {file_path}")
         return [{"Email": "dummy1@example.com", "Company Name": "Dummy Corp 1", "Status": "Processed", "Industry": "Tech"},
                 {"Email": "dummy2@example.com", "Company Name": "Dummy Corp 2", "Status": "Processed", "Industry": "Retail"},
                 {"Email": "", "Company Name": "No Email Corp", "Status": "Processed", "Industry": "Services"}]
+    def iter_data_from_csv(file_path, **kwargs):
+        return iter(extract_data_from_csv(file_path, **kwargs))
 try:
-    from email_generator import generate_email_content
-    print("Successfully imported generate_email_content from email_generator.")
+    from email_generator import generate_email_content, compile_prompt
+    print("Successfully imported generate_email_content and compile_prompt from email_generator.")
 except ImportError:
-    print("Warning: email_generator.py not found. Using dummy generate_email_content.")
+    print("Warning: email_generator.py not found. Using dummy generate_email_content and compile_prompt.")
+    def compile_prompt(user_prompt):
+        return lambda company_data: user_prompt.format_map(company_data)
     def generate_email_content(company_data, user_prompt):
         print(f"Dummy email_generator.generate_email_content for {company_data.get('Company Name')}")
-        filled_prompt = user_prompt.format(**company_data)
+        filled_prompt = user_prompt(company_data) if callable(user_prompt) else user_prompt.format_map(company_data)
         return f"Dummy email content for {company_data.get('Company Name')} based on prompt: '{filled_prompt}'"
 try:
-    from email_sender import send_email
-    print("Successfully imported send_email from email_sender.")
+    from email_sender import send_email, SMTPSession
+    print("Successfully imported send_email and SMTPSession from email_sender.")
 except ImportError:
-    print("Warning: email_sender.py not found. Using dummy send_email.")
+    print("Warning: email_sender.py not found. Using dummy send_email and SMTPSession.")
     def send_email(recipient_email, subject, body):
         print(f"Dummy email_sender.send_email to {recipient_email} with subject '{subject}'")
         if "dummy2" in recipient_email: return False, "Dummy sending failed for dummy2."
         return True, "Dummy email sent successfully."
+    class SMTPSession: # Dummy session that hands each email to the dummy send_email
+        def __enter__(self): return self
+        def __exit__(self, exc_type, exc_value, traceback): return False
+        def send(self, recipient_email, subject, body): return send_email(recipient_email, subject, body)
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = settings.SECRET_KEY
@@ -55,28 +81,314 @@ app.config['UPLOAD_FOLDER'] = 'uploads'
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
 PRECONFIGURED_CSV_FILE_PATH = settings.CSV_FILE_PATH # For /view-data
+_EMAIL_RE = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+") # name@domain.tld with no spaces; used with fullmatch
 LOG_FILE_PATH = 'sent_emails.log.csv'
+LOG_FIELDNAMES = ['timestamp', 'recipient', 'subject', 'status', 'message']
+_log_lock = threading.Lock() # Keeps rows from concurrent workers from interleaving
+_log_file = None # Opened once on the first logged attempt and kept open
+_log_writer = None
+LOG_STATS_PATH = 'sent_emails.stats.json' # Running /stats totals, checkpointed at a byte offset into the log
+RECENT_ENTRIES_COUNT = 10
+LOG_BATCH_SIZE = 1000 # /process-emails writes its log rows in chunks of this many
+_stats_lock = threading.Lock() # One /stats refresh at a time per process
+
+# --- Logging Functions ---
+def _log_file_replaced():
+    """True if the open log file was rotated or deleted since we opened it. Call with _log_lock held."""
+    try:
+        on_disk = os.stat(LOG_FILE_PATH)
+    except FileNotFoundError:
+        return True
+    opened = os.fstat(_log_file.fileno())
+    return (on_disk.st_ino, on_disk.st_dev) != (opened.st_ino, opened.st_dev)
+
+def _get_log_writer():
+    """
+    Returns the cached log writer, opening the log file on first use. Call with _log_lock held.
+
+    If the log was rotated or deleted since it was opened, the old handle is closed
+    and the file at LOG_FILE_PATH is (re)opened, so new rows don't go to an unlinked inode.
+    """
+    global _log_file, _log_writer
+    if _log_writer is not None and _log_file_replaced():
+        try:
+            _log_file.close() # Flushes rows still buffered for the old file
+        except Exception as e:
+            print(f"Error closing rotated log file {LOG_FILE_PATH}: {e}")
+        _log_file = _log_writer = None
+    if _log_writer is None:
+        _log_file = open(LOG_FILE_PATH, 'a', newline='', encoding='utf-8', buffering=8192)
+        _log_writer = csv.DictWriter(_log_file, fieldnames=LOG_FIELDNAMES)
+        if _log_file.tell() == 0: # Append mode opens at the end, so 0 means a new or empty file
+            _log_writer.writeheader()
+    return _log_writer
+
+def _log_row(recipient, subject, status, message):
+    """Builds one email log record, timestamped now."""
+    return {
+        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'recipient': recipient,
+        'subject': subject,
+        'status': status,
+        'message': message
+    }
+
+def log_email_attempts(rows):
+    """Appends several records (built with _log_row) to the email log CSV file in one write."""
+    if not rows:
+        return
+    try:
+        with _log_lock:
+            _get_log_writer().writerows(rows)
+    except Exception as e:
+        print(f"Error writing to log file {LOG_FILE_PATH}: {e}")
 
-# --- Logging Function ---
 def log_email_attempt(recipient, subject, status, message):
-    """Appends a record to the email log CSV file."""
-    file_exists = os.path.isfile(LOG_FILE_PATH)
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    """Appends a record to the email log CSV file. Rows are buffered; see flush_email_log."""
+    log_email_attempts([_log_row(recipient, subject, status, message)])
+
+def flush_email_log():
+    """Writes any buffered log rows to disk, e.g. at the end of a batch or before reading the log."""
+    with _log_lock:
+        if _log_file is not None:
+            try:
+                _log_file.flush()
+            except Exception as e:
+                print(f"Error flushing log file {LOG_FILE_PATH}: {e}")
+
+def _close_email_log():
+    """Flushes and closes the log file when the process exits."""
+    global _log_file, _log_writer
+    with _log_lock:
+        if _log_file is not None:
+            _log_file.close()
+            _log_file = None
+            _log_writer = None
+
+atexit.register(_close_email_log)
+
+# --- Stats Functions ---
+# /stats keeps running totals in LOG_STATS_PATH together with the log offset they cover,
+# and only parses rows appended since then. The log itself stays the source of truth, so
+# the totals remain correct when several server processes append to the same log.
+# For the recent entries only the start offsets of the last few records are kept; the
+# entries are read back from the tail of the log, so the checkpoint stays small.
+def _empty_log_stats():
+    return {"total_attempts": 0, "successful_sends": 0, "failed_sends": 0, "recent_offsets": [],
+            "fieldnames": None, "log_offset": 0, "log_inode": os.stat(LOG_FILE_PATH).st_ino}
+
+def _load_log_stats():
+    """Loads the saved stats checkpoint, or a fresh one if it is missing, unreadable or no longer matches the log."""
     try:
-        with open(LOG_FILE_PATH, 'a', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['timestamp', 'recipient', 'subject', 'status', 'message']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            if not file_exists or os.path.getsize(LOG_FILE_PATH) == 0: # Check size for empty file too
-                writer.writeheader() # Write header if file is new or empty
-            writer.writerow({
-                'timestamp': now,
-                'recipient': recipient,
-                'subject': subject,
-                'status': status,
-                'message': message
-            })
+        with open(LOG_STATS_PATH, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        log_stat = os.stat(LOG_FILE_PATH)
+        if (saved.get("log_inode") == log_stat.st_ino and saved.get("log_offset", 0) <= log_stat.st_size
+                and "recent_offsets" in saved):
+            return saved
+        print(f"Log file {LOG_FILE_PATH} was replaced or truncated since the last stats checkpoint. Rebuilding stats.")
+        os.remove(LOG_STATS_PATH)
+    except FileNotFoundError:
+        pass
     except Exception as e:
-        print(f"Error writing to log file {LOG_FILE_PATH}: {e}")
+        print(f"Could not read stats file {LOG_STATS_PATH}: {e}. Rebuilding stats.")
+    return _empty_log_stats()
+
+def _save_log_stats(stats):
+    """Writes the stats checkpoint to a temp file and swaps it in, so readers never see a partial file."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(LOG_STATS_PATH)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(stats, f)
+        os.replace(tmp_path, LOG_STATS_PATH)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+def _read_log_records(start_offset):
+    """
+    Yields (fields, end_offset) for each complete CSV record in the log after start_offset.
+
+    A record can span lines when a quoted field contains a newline; it is complete once its
+    quotes balance. A trailing unterminated record (e.g. another process's half-flushed
+    buffer) is left for the next refresh.
+    """
+    with open(LOG_FILE_PATH, 'rb') as f:
+        f.seek(start_offset)
+        offset = start_offset
+        pending = b''
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            pending += line
+            if pending.count(b'"') % 2: # Still inside a quoted field
+                continue
+            offset += len(pending)
+            yield next(csv.reader(io.StringIO(pending.decode('utf-8'), newline=''))), offset
+            pending = b''
+
+def _refresh_log_stats():
+    """Brings the stats checkpoint up to date with the log and returns it. Call with _stats_lock held."""
+    stats = _load_log_stats()
+    start_offset = stats["log_offset"]
+    status_index = None
+    for fields, offset in _read_log_records(start_offset):
+        if stats["fieldnames"] is None: # First record is the header
+            stats["fieldnames"] = fields
+        else:
+            if status_index is None:
+                normalized_log_headers = [name.strip().lower() for name in stats["fieldnames"]]
+                status_index = normalized_log_headers.index('status') if 'status' in normalized_log_headers else -1
+            status = fields[status_index] if 0 <= status_index < len(fields) else ''
+            stats["total_attempts"] += 1
+            if status.strip().lower() == 'sent':
+                stats["successful_sends"] += 1
+            else:
+                stats["failed_sends"] += 1
+            stats["recent_offsets"].append(stats["log_offset"]) # Where this record starts
+            del stats["recent_offsets"][:-RECENT_ENTRIES_COUNT]
+        stats["log_offset"] = offset
+    if stats["log_offset"] != start_offset:
+        _save_log_stats(stats)
+    return stats
+
+def _read_recent_log_entries(stats):
+    """Reads the records listed in the checkpoint's recent_offsets with one seek to the tail of the log."""
+    if not stats["recent_offsets"]:
+        return []
+    with open(LOG_FILE_PATH, 'rb') as f:
+        f.seek(stats["recent_offsets"][0])
+        tail = f.read(stats["log_offset"] - stats["recent_offsets"][0])
+    return list(csv.DictReader(io.StringIO(tail.decode('utf-8'), newline=''), fieldnames=stats["fieldnames"]))
+
+# --- Send Pipeline ---
+_PIPELINE_DONE = object() # Tells a pipeline stage that its input is finished
+PIPELINE_QUEUE_SIZE = 64 # How many contacts may wait between two stages
+
+def _validate_contact(contact_data):
+    """
+    Checks one contact before any network work is spent on it.
+    Returns (recipient_email, company_name, subject, failure_reason); failure_reason is None for a valid contact.
+    """
+    recipient_email = contact_data.get("Email")
+    company_name = contact_data.get("Company Name") if contact_data.get("Company Name") else "Valued Partner"
+    subject = f"Regarding Your Business, {company_name}"
+
+    # Reject malformed addresses before spending a Gemini call and an SMTP round-trip on them
+    if not (isinstance(recipient_email, str) and _EMAIL_RE.fullmatch(recipient_email)):
+        reason = "Missing or invalid email address in CSV row."
+        print(f"Skipping contact ({company_name}) due to: {reason}")
+        return recipient_email or "N/A", company_name, subject, reason
+    return recipient_email, company_name, subject, None
+
+def _generate_body(contact_data, render_prompt, recipient_email):
+    """Generates the email body for a valid contact. Returns (email_body, failure_reason); email_body is None on failure."""
+    try:
+        email_body = generate_email_content(contact_data, render_prompt)
+    except KeyError as e_key:
+        reason = f"Prompt formatting error: Missing key {e_key}. Ensure all prompt placeholders match CSV headers."
+        print(f"Email generation failed for {recipient_email}: {reason}")
+        return None, reason
+
+    if "Error:" in email_body or ("Dummy email content" in email_body and "dummy_generator" in email_body):
+        reason = f"Email content generation issue: {email_body}"
+        print(f"Email generation failed or used dummy for {recipient_email}: {reason}")
+        return None, reason
+    return email_body, None
+
+def _run_email_pipeline(contacts, render_prompt, smtp_session, batch_log, generation_workers):
+    """
+    Validates, generates and sends a batch of emails as three concurrent stages:
+
+        producer thread:       validate each contact            -> generate_queue
+        generation_workers:    call Gemini for valid contacts   -> send_queue
+        calling thread:        send over smtp_session, log to batch_log
+
+    Contacts are read from `contacts` only as fast as the stages drain, and each
+    email is sent as soon as its body is ready, so one slow generation doesn't hold
+    up the others. Log rows go to batch_log and are written every LOG_BATCH_SIZE rows.
+
+    Returns (results, emails_sent_count, emails_failed_count), with results in CSV order.
+    If reading `contacts` raises, nothing more is sent and the error is re-raised
+    once the stages have stopped; rows already sent stay in batch_log.
+    """
+    generate_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    send_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    producer_errors = []
+
+    def produce():
+        try:
+            for index, contact_data in enumerate(contacts):
+                generate_queue.put((index, contact_data, *_validate_contact(contact_data)))
+        except Exception as e: # Reported by the calling thread once the pipeline has drained
+            producer_errors.append(e)
+        finally:
+            for _ in range(generation_workers):
+                generate_queue.put(_PIPELINE_DONE)
+
+    def generate():
+        try:
+            while (item := generate_queue.get()) is not _PIPELINE_DONE:
+                if producer_errors: # The CSV failed partway; don't spend API calls on a batch that will be aborted
+                    continue
+                index, contact_data, recipient_email, company_name, subject, reason = item
+                email_body = None
+                if reason is None:
+                    try:
+                        email_body, reason = _generate_body(contact_data, render_prompt, recipient_email)
+                    except Exception as e:
+                        reason = f"Email content generation issue: {e}"
+                send_queue.put((index, recipient_email, company_name, subject, email_body, reason))
+        finally:
+            send_queue.put(_PIPELINE_DONE)
+
+    threads = [threading.Thread(target=produce, daemon=True)]
+    threads += [threading.Thread(target=generate, daemon=True) for _ in range(generation_workers)]
+    for thread in threads:
+        thread.start()
+
+    results_by_index = {}
+    emails_sent_count = 0
+    emails_failed_count = 0
+    running_workers = generation_workers
+    while running_workers:
+        item = send_queue.get()
+        if item is _PIPELINE_DONE:
+            running_workers -= 1
+            continue
+        if producer_errors: # Stop sending as soon as reading the CSV fails; just drain what's queued
+            continue
+        index, recipient_email, company_name, subject, email_body, reason = item
+
+        if len(batch_log) >= LOG_BATCH_SIZE:
+            log_email_attempts(batch_log)
+            batch_log.clear()
+
+        if email_body is None:
+            batch_log.append(_log_row(recipient_email, subject, "Failed", reason))
+            results_by_index[index] = {"recipient": recipient_email, "company": company_name, "status": "Failed", "reason": reason}
+            emails_failed_count += 1
+            continue
+
+        print(f"Attempting to send email to {recipient_email} for company {company_name}...")
+        success, message = smtp_session.send(recipient_email, subject, email_body)
+        log_status = "Sent" if success else "Failed"
+        batch_log.append(_log_row(recipient_email, subject, log_status, message))
+
+        if success:
+            emails_sent_count += 1
+            results_by_index[index] = {"recipient": recipient_email, "company": company_name, "status": "Sent", "message": message}
+        else:
+            emails_failed_count += 1
+            results_by_index[index] = {"recipient": recipient_email, "company": company_name, "status": "Failed", "reason": message}
+
+    for thread in threads:
+        thread.join()
+    if producer_errors:
+        raise producer_errors[0]
+
+    results = [results_by_index[index] for index in sorted(results_by_index)]
+    return results, emails_sent_count, emails_failed_count
 
 # --- Routes ---
 @app.route('/')
@@ -98,127 +410,114 @@ def process_emails_route():
     if not prompt_template: return jsonify({"error": "Prompt template required"}), 400
 
     if file and file.filename.endswith('.csv'):
+        uploaded_filepath = None
+        contacts = None
         try:
             filename = werkzeug.utils.secure_filename(file.filename)
-            uploaded_filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(uploaded_filepath)
+            # The batch streams from this file until it finishes, so each upload gets its own
+            # file; a concurrent upload with the same name must not overwrite it midway.
+            fd, uploaded_filepath = tempfile.mkstemp(dir=app.config['UPLOAD_FOLDER'], prefix=os.path.splitext(filename)[0] + '-', suffix='.csv')
+            with os.fdopen(fd, 'wb') as upload_file:
+                file.save(upload_file)
 
             print(f"File '{filename}' uploaded to '{uploaded_filepath}'. Processing with prompt: '{prompt_template}'")
-            contacts = extract_data_from_csv(uploaded_filepath)
-            if not contacts:
+            try:
+                render_prompt = compile_prompt(prompt_template) # Parse the template once for the whole batch
+            except ValueError as e_fmt:
+                return jsonify({"error": f"Invalid prompt template: {e_fmt}"}), 400
+            contacts = iter_data_from_csv(uploaded_filepath) # Streamed, so sending starts before the file is fully read
+            first_contact = next(contacts, None)
+            if first_contact is None:
                 msg = f"No data extracted from {filename}. Check file content or column names."
                 print(msg)
                 log_email_attempt("N/A", "Batch Processing Error", "Failed", msg)
+                flush_email_log()
                 return jsonify({"error": msg}), 400
 
-            results = []
-            emails_sent_count = 0
-            emails_failed_count = 0
-
-            for contact_data in contacts:
-                recipient_email = contact_data.get("Email")
-                company_name = contact_data.get("Company Name") if contact_data.get("Company Name") else "Valued Partner"
-                subject = f"Regarding Your Business, {company_name}"
-
-                if not recipient_email or not isinstance(recipient_email, str) or "@" not in recipient_email:
-                    reason = "Missing or invalid email address in CSV row."
-                    print(f"Skipping contact ({company_name}) due to: {reason}")
-                    log_email_attempt(recipient_email or "N/A", subject, "Failed", reason)
-                    results.append({"recipient": recipient_email or "N/A", "company": company_name, "status": "Failed", "reason": reason})
-                    emails_failed_count += 1
-                    continue
-
-                try:
-                    email_body = generate_email_content(contact_data, prompt_template)
-                except KeyError as e_key:
-                    reason = f"Prompt formatting error: Missing key {e_key}. Ensure all prompt placeholders match CSV headers."
-                    print(f"Email generation failed for {recipient_email}: {reason}")
-                    log_email_attempt(recipient_email, subject, "Failed", reason)
-                    results.append({"recipient": recipient_email, "company": company_name, "status": "Failed", "reason": reason})
-                    emails_failed_count += 1
-                    continue
-
-                if "Error:" in email_body or ("Dummy email content" in email_body and "dummy_generator" in email_body):
-                    reason = f"Email content generation issue: {email_body}"
-                    print(f"Email generation failed or used dummy for {recipient_email}: {reason}")
-                    log_email_attempt(recipient_email, subject, "Failed", reason)
-                    results.append({"recipient": recipient_email, "company": company_name, "status": "Failed", "reason": reason})
-                    emails_failed_count += 1
-                    continue
-
-                print(f"Attempting to send email to {recipient_email} for company {company_name}...")
-                success, message = send_email(recipient_email, subject, email_body)
-                log_status = "Sent" if success else "Failed"
-                log_email_attempt(recipient_email, subject, log_status, message)
-
-                if success:
-                    emails_sent_count += 1
-                    results.append({"recipient": recipient_email, "company": company_name, "status": "Sent", "message": message})
-                else:
-                    emails_failed_count += 1
-                    results.append({"recipient": recipient_email, "company": company_name, "status": "Failed", "reason": message})
+            batch_log = [] # Log rows are collected and written in bulk rather than one at a time
+            try:
+                with SMTPSession() as smtp_session: # One SMTP connection for the whole batch
+                    results, emails_sent_count, emails_failed_count = _run_email_pipeline(
+                        itertools.chain([first_contact], contacts), render_prompt, smtp_session, batch_log,
+                        generation_workers=max(1, settings.EMAIL_WORKERS))
+            finally:
+                log_email_attempts(batch_log) # Also keeps the rows of a batch that failed midway
 
+            flush_email_log()
             summary_msg = "Email processing complete."
             print(f"{summary_msg} Sent: {emails_sent_count}, Failed: {emails_failed_count}")
             return jsonify({
                 "message": summary_msg,
-                "summary": {"total_contacts_processed": len(contacts), "emails_sent": emails_sent_count, "emails_failed": emails_failed_count},
+                "summary": {"total_contacts_processed": len(results), "emails_sent": emails_sent_count, "emails_failed": emails_failed_count},
                 "details": results
             })
         except Exception as e:
             error_str = str(e)
             print(f"Error in /process-emails: {error_str}")
             log_email_attempt("N/A", "Batch Processing Error", "Failed", error_str)
+            flush_email_log()
             return jsonify({"error": f"An unexpected error occurred during processing: {error_str}"}), 500
+        finally:
+            if contacts is not None:
+                contacts.close() # Closes the CSV if the batch stopped before reading all of it
+            if uploaded_filepath is not None:
+                try:
+                    os.remove(uploaded_filepath)
+                except OSError as e:
+                    print(f"Warning: Could not remove uploaded file {uploaded_filepath}: {e}")
     else:
         return jsonify({"error": "Invalid file type. Please upload a CSV file."}), 400
 
 @app.route('/stats')
 def stats_route():
+    flush_email_log() # Make buffered rows visible to the reader below
     if not os.path.exists(LOG_FILE_PATH):
         return jsonify({"error": "Log file not found. No emails processed yet or logging failed."}), 404
 
-    stats = {"total_attempts": 0, "successful_sends": 0, "failed_sends": 0, "recent_entries": []}
     try:
-        with open(LOG_FILE_PATH, 'r', newline='', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            # Check for header by trying to read fieldnames; if file is empty, fieldnames is None
-            if not reader.fieldnames:
-                return jsonify({"message": "Log file is empty.", "stats": stats}), 200
-
-            # Normalize header names for checking
-            normalized_log_headers = [name.strip().lower() for name in reader.fieldnames]
-            if 'status' not in normalized_log_headers:
-                 return jsonify({"error": "Log file has incorrect format (missing 'status' column)."}), 500
-
-            log_entries = list(reader) # Read all entries
-            stats["total_attempts"] = len(log_entries)
-
-            for row in log_entries:
-                # Ensure 'status' key exists in row before lowercasing, use .get for safety
-                if row.get('status', '').strip().lower() == 'sent':
-                    stats["successful_sends"] += 1
-                else:
-                    stats["failed_sends"] += 1
-
-            # Get last 10 entries (or all if fewer than 10)
-            stats["recent_entries"] = log_entries[-10:]
-
+        with _stats_lock:
+            saved_stats = _refresh_log_stats()
+        recent_entries = _read_recent_log_entries(saved_stats)
     except Exception as e:
         print(f"Error reading log file {LOG_FILE_PATH}: {e}")
         return jsonify({"error": f"Could not read or parse log file: {e}"}), 500
 
+    stats = {key: saved_stats[key] for key in ("total_attempts", "successful_sends", "failed_sends")}
+    stats["recent_entries"] = recent_entries
+    if not saved_stats["fieldnames"]: # No header yet, so nothing has been logged
+        return jsonify({"message": "Log file is empty.", "stats": stats}), 200
+
+    # Normalize header names for checking
+    normalized_log_headers = [name.strip().lower() for name in saved_stats["fieldnames"]]
+    if 'status' not in normalized_log_headers:
+        return jsonify({"error": "Log file has incorrect format (missing 'status' column)."}), 500
+
     return jsonify(stats)
 
 # Existing test routes
+@functools.lru_cache(maxsize=4)
+def _view_data_cached(path, mtime_ns, size):
+    """
+    Parses a CSV for /view-data and serializes it once. Returns (data, json_body).
+    The file's mtime and size are part of the cache key, so editing the file invalidates it.
+    """
+    data = extract_data_from_csv(path)
+    return data, app.json.dumps(data)
+
 @app.route('/view-data')
 def view_data_route():
-    if not os.path.exists(PRECONFIGURED_CSV_FILE_PATH): return jsonify({"error": f"CSV file not found at {PRECONFIGURED_CSV_FILE_PATH}"}), 404
-    processed_data = extract_data_from_csv(PRECONFIGURED_CSV_FILE_PATH)
+    try:
+        st = os.stat(PRECONFIGURED_CSV_FILE_PATH)
+    except FileNotFoundError:
+        return jsonify({"error": f"CSV file not found at {PRECONFIGURED_CSV_FILE_PATH}"}), 404
+    try:
+        processed_data, json_body = _view_data_cached(PRECONFIGURED_CSV_FILE_PATH, st.st_mtime_ns, st.st_size)
+    except Exception as e: # e.g. invalid UTF-8 partway through the file
+        return jsonify({"error": f"Failed to extract data from CSV: {e}"}), 500
     if not processed_data:
         if os.path.exists(PRECONFIGURED_CSV_FILE_PATH): return jsonify({"message": "CSV file processed, but no data was extracted.", "data": []})
         return jsonify({"error": "Failed to extract data from CSV or file is empty."}), 500
-    return jsonify(processed_data)
+    return app.response_class(json_body, mimetype='application/json')
 
 @app.route('/generate-test-email')
 def generate_test_email_route():
@@ -247,11 +546,13 @@ def send_test_email_route():
     success, message = send_email(recipient, email_subject, email_body)
     # Log final status for test sends
     log_email_attempt(recipient, email_subject, "Test - Sent" if success else "Test - Failed", message)
+    flush_email_log()
 
     if success: return jsonify({"status": "success", "message": message})
     else: return jsonify({"status": "failure", "message": message}), 500
 
 if __name__ == '__main__':
+    # Development server only; for production use: gunicorn -c gunicorn_conf.py app:app
     print("Attempting to start Flask app with logging and stats route...")
     try:
         app.run(host='0.0.0.0', port=8080)
@@ -1,4 +1,5 @@
 import os
+from dataclasses import dataclass, field
 from dotenv import load_dotenv
 
 # Load .env file from the root directory
@@ -16,31 +17,44 @@ else:
     print(f"Loading .env file from: {os.path.abspath(dotenv_path)}") # Show absolute path for clarity
     load_dotenv(dotenv_path)
 
+def _env_flag(name, default):
+    """Reads a 'true'/'1'/'t' style boolean from the environment."""
+    return os.environ.get(name, default).lower() in ('true', '1', 't')
+
+# Frozen so nothing can change a setting at runtime; slots make attribute reads cheaper.
+# Fields read the environment when Settings() is created, i.e. after the .env file is loaded.
+@dataclass(frozen=True, slots=True)
 class Settings:
     # Flask settings
-    SECRET_KEY = os.environ.get('SECRET_KEY') or 'a-secure-default-secret-key-please-change'
-    DEBUG = os.environ.get('FLASK_DEBUG', 'False').lower() in ('true', '1', 't')
+    SECRET_KEY: str = field(default_factory=lambda: os.environ.get('SECRET_KEY') or 'a-secure-default-secret-key-please-change')
+    DEBUG: bool = field(default_factory=lambda: _env_flag('FLASK_DEBUG', 'False'))
 
     # Gemini API Key
-    GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
+    GEMINI_API_KEY: str = field(default_factory=lambda: os.environ.get('GEMINI_API_KEY'))
+    # Reuse the generated body when the exact same prompt is sent again
+    GEMINI_CACHE: bool = field(default_factory=lambda: _env_flag('GEMINI_CACHE', 'True'))
 
     # SMTP Settings
-    SMTP_HOST = os.environ.get('SMTP_HOST')
-    SMTP_PORT = int(os.environ.get('SMTP_PORT', 587)) # Default to 587 if not set
-    SMTP_USERNAME = os.environ.get('SMTP_USERNAME')
-    SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD')
-    SMTP_SENDER_EMAIL = os.environ.get('SMTP_SENDER_EMAIL') # 'From' email address
-    SMTP_USE_TLS = os.environ.get('SMTP_USE_TLS', 'True').lower() in ('true', '1', 't')
+    SMTP_HOST: str = field(default_factory=lambda: os.environ.get('SMTP_HOST'))
+    SMTP_PORT: int = field(default_factory=lambda: int(os.environ.get('SMTP_PORT', 587))) # Default to 587 if not set
+    SMTP_USERNAME: str = field(default_factory=lambda: os.environ.get('SMTP_USERNAME'))
+    SMTP_PASSWORD: str = field(default_factory=lambda: os.environ.get('SMTP_PASSWORD'))
+    SMTP_SENDER_EMAIL: str = field(default_factory=lambda: os.environ.get('SMTP_SENDER_EMAIL')) # 'From' email address
+    SMTP_USE_TLS: bool = field(default_factory=lambda: _env_flag('SMTP_USE_TLS', 'True'))
+
+    # Number of email bodies generated concurrently by /process-emails
+    EMAIL_WORKERS: int = field(default_factory=lambda: int(os.environ.get('EMAIL_WORKERS', 8)))
 
     # CSV File Path (can also be configured here)
-    CSV_FILE_PATH = os.environ.get('CSV_FILE_PATH') or 'export_50.csv'
+    CSV_FILE_PATH: str = field(default_factory=lambda: os.environ.get('CSV_FILE_PATH') or 'export_50.csv')
 
-    # Basic check for essential configs
-    # These print statements will execute when the module is imported.
-    if not GEMINI_API_KEY:
-        print("Warning: GEMINI_API_KEY is not set in environment or .env file.")
-    if not SMTP_HOST:
-        print("Warning: SMTP_HOST is not set. Email sending will likely fail.")
+    def __post_init__(self):
+        # Basic check for essential configs
+        # These print statements will execute when settings are created at import.
+        if not self.GEMINI_API_KEY:
+            print("Warning: GEMINI_API_KEY is not set in environment or .env file.")
+        if not self.SMTP_HOST:
+            print("Warning: SMTP_HOST is not set. Email sending will likely fail.")
 
 # Instantiate settings to be imported by other modules
 settings = Settings()
@@ -54,6 +68,7 @@ if __name__ == '__main__':
     print(f"SMTP Port: {settings.SMTP_PORT}")
     print(f"SMTP Username: {settings.SMTP_USERNAME}")
     print(f"SMTP Sender Email: {settings.SMTP_SENDER_EMAIL}")
+    print(f"Email Workers: {settings.EMAIL_WORKERS}")
     print(f"CSV File Path: {settings.CSV_FILE_PATH}")
     if settings.GEMINI_API_KEY:
         print(f"Gemini Key (first 5 chars): {settings.GEMINI_API_KEY[:5]}...")
@@ -1,11 +1,16 @@
 import os
+import functools
+import re
+import string
 try:
-    import google.generativeai as genai
-    print("Successfully imported google.generativeai.")
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    print("Successfully imported requests.")
 except ImportError:
-    print("Warning: google-generativeai library not found. Email generation will not work.")
-    print("Please install it if running locally: pip install google-generativeai")
-    genai = None # Placeholder
+    print("Warning: requests library not found. Email generation will not work.")
+    print("Please install it if running locally: pip install requests")
+    requests = None # Placeholder
 
 # Attempt to import settings from config.py
 # This assumes config.py is in the same directory or accessible via PYTHONPATH
@@ -17,32 +22,163 @@ except ImportError:
     # Define a dummy settings object for the script to be syntactically valid if config is missing
     class DummySettings:
         GEMINI_API_KEY = None
+        GEMINI_CACHE = True
     settings = DummySettings()
 
 
+GEMINI_API_URL = 'https://generativelanguage.googleapis.com/v1beta/models/gemini-1.0-pro:generateContent'
+GEMINI_TIMEOUT = 60 # Seconds to wait for one generation
+
+@functools.lru_cache(maxsize=1)
+def _get_session():
+    """
+    Builds the HTTP session for the Gemini REST API once and returns it on every call.
+
+    The session keeps connections alive, so a batch reuses TCP and TLS connections
+    instead of handshaking for every email. The pool is large enough for the
+    concurrent generations of several batches at once; with the default of 10,
+    urllib3 would open and discard extra sockets.
+
+    Rate limiting (429) and transient server errors are retried with backoff.
+    POST is retried explicitly because urllib3 skips it by default; asking
+    for the same generation twice is harmless.
+    """
+    session = requests.Session()
+    session.headers['x-goog-api-key'] = settings.GEMINI_API_KEY
+    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                    allowed_methods=frozenset(['POST']), raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=64, pool_maxsize=64, max_retries=retries)
+    session.mount('https://', adapter)
+    return session
+
+
+_PROMPT_FORMATTER = string.Formatter()
+_FIELD_ARG_NAME_RE = re.compile(r"[^.\[]*") # The key part of "name.attr" / "name[index]"
+
+def _check_prompt_fields(parsed):
+    """
+    Raises ValueError for fields str.format_map would reject when rendering: positional
+    fields ("{}", "{0}") and unknown conversions. Nested fields in format specs are checked too.
+    """
+    for literal_text, field_name, format_spec, conversion in parsed:
+        if field_name is None:
+            continue
+        key = _FIELD_ARG_NAME_RE.match(field_name).group()
+        if not key or key.isdigit():
+            raise ValueError(f"Format string contains positional fields: {{{field_name}}}")
+        if conversion not in (None, "r", "s", "a"):
+            raise ValueError(f"Unknown conversion specifier {conversion}")
+        if format_spec and "{" in format_spec:
+            _check_prompt_fields(_PROMPT_FORMATTER.parse(format_spec))
+
+def compile_prompt(user_prompt):
+    """
+    Parses a prompt template once and returns a function that fills it in for a company.
+
+    Use this when the same prompt is sent for many companies, so the template is not
+    re-parsed for every one. Placeholders behave like str.format keyword fields
+    (conversions and format specs included); a placeholder with no matching key
+    raises KeyError. Positional placeholders ("{}", "{0}") are rejected up front,
+    as str.format_map would reject them on every row.
+
+    Args:
+        user_prompt (str): The user-defined prompt or template for the email.
+
+    Returns:
+        callable: Takes a company_data dict and returns the filled-in prompt.
+
+    Raises:
+        ValueError: If the template is malformed (e.g. an unmatched brace) or uses positional fields.
+    """
+    formatter = _PROMPT_FORMATTER
+    fields = list(formatter.parse(user_prompt))
+    _check_prompt_fields(fields)
+    # The last item flags specs with nested fields, e.g. "{Company Name:>{Width}}"
+    parsed = [(literal_text, field_name, format_spec, conversion, bool(format_spec) and "{" in format_spec)
+              for literal_text, field_name, format_spec, conversion in fields]
+
+    def render(company_data):
+        parts = []
+        for literal_text, field_name, format_spec, conversion, nested_spec in parsed:
+            parts.append(literal_text)
+            if field_name is not None:
+                value = formatter.get_field(field_name, (), company_data)[0]
+                value = formatter.convert_field(value, conversion)
+                if nested_spec: # Fill in the spec's own placeholders first, as str.format does
+                    format_spec = formatter.vformat(format_spec, (), company_data)
+                parts.append(formatter.format_field(value, format_spec))
+        return "".join(parts)
+
+    return render
+
+
+class GeminiBlockedError(Exception):
+    """Raised when Gemini returns no content for a prompt, e.g. because it was blocked."""
+
+
+def _call_gemini(full_prompt):
+    """
+    Sends a prompt to Gemini and returns the generated text.
+
+    Raises instead of returning an error string, so failed calls are never cached.
+    """
+    print(f"Debug: Sending prompt to Gemini API: {full_prompt[:150]}...") # Log snippet of prompt
+    response = _get_session().post(GEMINI_API_URL, json={"contents": [{"parts": [{"text": full_prompt}]}]}, timeout=GEMINI_TIMEOUT)
+    if not response.ok:
+        try:
+            detail = response.json()["error"]["message"]
+        except Exception:
+            detail = response.text[:200]
+        raise requests.HTTPError(f"Gemini API returned HTTP {response.status_code}: {detail}", response=response)
+    data = response.json()
+
+    candidates = data.get("candidates") or []
+    parts = candidates[0].get("content", {}).get("parts", []) if candidates else []
+    if parts:
+        print("Debug: Received response with parts from Gemini API.")
+        return "".join(part.get("text", "") for part in parts)
+
+    block_reason = "Unknown"
+    safety_ratings_str = "N/A"
+    prompt_feedback = data.get("promptFeedback")
+    if prompt_feedback:
+        block_reason = prompt_feedback.get("blockReason", block_reason)
+        safety_ratings_str = str(prompt_feedback.get("safetyRatings", safety_ratings_str))
+    elif candidates: # The prompt was accepted but the answer was stopped, e.g. for safety
+        block_reason = candidates[0].get("finishReason", block_reason)
+        safety_ratings_str = str(candidates[0].get("safetyRatings", safety_ratings_str))
+    else: # If prompt_feedback itself is None
+        print("Debug: No prompt_feedback in response.")
+    raise GeminiBlockedError(f"Failed to generate content. Block Reason: {block_reason}. Safety Ratings: {safety_ratings_str}")
+
+# Identical prompts (e.g. a contact listed twice in the CSV) reuse the first generated
+# body instead of calling the API again. Set GEMINI_CACHE=False for fresh generations.
+_cached_call_gemini = functools.lru_cache(maxsize=1024)(_call_gemini)
+
+
 def generate_email_content(company_data, user_prompt):
     """
-    Generates email content using the Gemini API.
+    Generates email content using the Gemini REST API.
 
     Args:
         company_data (dict): A dictionary containing company-specific data.
-        user_prompt (str): The user-defined prompt or template for the email.
+        user_prompt (str or callable): The user-defined prompt or template for the email,
+            or a template already compiled with compile_prompt.
 
     Returns:
         str: The generated email content, or an error message if generation fails.
     """
-    if not genai:
-        return "Error: google-generativeai library is not installed or loaded."
+    if not requests:
+        return "Error: requests library is not installed or loaded."
 
     if not settings.GEMINI_API_KEY:
         return "Error: GEMINI_API_KEY is not configured in settings."
 
     try:
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-
-        model = genai.GenerativeModel('gemini-1.0-pro')
-
-        prompt_for_api = user_prompt.format(**company_data) # Basic placeholder replacement
+        if callable(user_prompt): # Precompiled with compile_prompt
+            prompt_for_api = user_prompt(company_data)
+        else:
+            prompt_for_api = user_prompt.format_map(company_data) # Basic placeholder replacement
 
         full_prompt = f"""
         Generate a professional and personalized email based on the following information and instructions:
@@ -57,25 +193,12 @@ def generate_email_content(company_data, user_prompt):
         Please generate only the body of the email.
         """
 
-        print(f"Debug: Sending prompt to Gemini API: {full_prompt[:150]}...") # Log snippet of prompt
-        response = model.generate_content(full_prompt)
-
-        if response.parts:
-            print("Debug: Received response with parts from Gemini API.")
-            return response.text
-        else:
-            block_reason = "Unknown"
-            safety_ratings_str = "N/A"
-            if response.prompt_feedback:
-                block_reason = response.prompt_feedback.block_reason
-                safety_ratings_str = str(response.prompt_feedback.safety_ratings)
-            else: # If prompt_feedback itself is None
-                 print("Debug: No prompt_feedback in response.")
-
-
-            print(f"Error: Failed to generate content. Block Reason: {block_reason}. Safety Ratings: {safety_ratings_str}")
-            return f"Error: Failed to generate content. Block Reason: {block_reason}. Safety Ratings: {safety_ratings_str}"
+        call_gemini = _cached_call_gemini if settings.GEMINI_CACHE else _call_gemini
+        return call_gemini(full_prompt)
 
+    except GeminiBlockedError as e:
+        print(f"Error: {e}")
+        return f"Error: {e}"
     except Exception as e:
         print(f"Error during Gemini API call: {e}")
         return f"Error generating email content: {str(e)}"
@@ -83,8 +206,8 @@ def generate_email_content(company_data, user_prompt):
 if __name__ == '__main__': # Corrected: added quotes around '__main__'
     print("--- Email Generator Test ---")
 
-    if not genai:
-        print("Skipping test: google-generativeai library not available.")
+    if not requests:
+        print("Skipping test: requests library not available.")
     elif not settings.GEMINI_API_KEY:
         print("Skipping test: GEMINI_API_KEY not set in config settings.")
     else:
@@ -1,7 +1,7 @@
 import smtplib
 from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart # For more complex emails later if needed
 import sys # For printing to stderr
+import threading # For sharing one SMTP session between worker threads
 
 # Attempt to import settings from config.py
 try:
@@ -20,10 +20,142 @@ except ImportError:
         GEMINI_API_KEY = None # Added for the __main__ block check consistency
     settings = DummySettings()
 
+# Settings don't change at runtime; bind the ones used on every send to module globals once.
+_HOST = settings.SMTP_HOST
+_PORT = settings.SMTP_PORT
+_SENDER_EMAIL = settings.SMTP_SENDER_EMAIL
+_USERNAME = settings.SMTP_USERNAME
+_PASSWORD = settings.SMTP_PASSWORD
+_USE_TLS = settings.SMTP_USE_TLS
+
+class SMTPSession:
+    """
+    Keeps one authenticated SMTP connection open for a batch of emails.
+
+    The connection (EHLO/STARTTLS/LOGIN) is made on the first send and reused
+    for every following send until the session exits, so a batch of N emails
+    pays for one handshake instead of N. Sends are serialized with a lock so
+    one session can be shared by worker threads.
+
+    Usage:
+        with SMTPSession() as session:
+            success, message = session.send(recipient_email, subject, body)
+    """
+
+    def __init__(self):
+        self.server = None
+        self._lock = threading.Lock() # smtplib connections are not safe to use from several threads at once
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        with self._lock:
+            self._close()
+        return False
+
+    def _connect(self):
+        """Opens and authenticates a new SMTP connection."""
+        print(f"Attempting to connect to SMTP: {_HOST}:{_PORT}", file=sys.stderr)
+        if _USE_TLS:
+            server = smtplib.SMTP(_HOST, _PORT, timeout=10) # Added timeout
+            server.ehlo()
+            server.starttls()
+            server.ehlo()
+        else:
+            server = smtplib.SMTP_SSL(_HOST, _PORT, timeout=10) # Added timeout
+
+        if _USERNAME and _PASSWORD:
+            print(f"Attempting SMTP login for user: {_USERNAME}", file=sys.stderr)
+            server.login(_USERNAME, _PASSWORD)
+        self.server = server
+
+    def _close(self):
+        """Closes the connection if one is open, ignoring errors from an already dead server."""
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except Exception:
+            self.server.close()
+        self.server = None
+
+    def send(self, recipient_email, subject, body):
+        """
+        Sends an email over the session's connection, connecting on first use.
+
+        Args:
+            recipient_email (str): The email address of the recipient.
+            subject (str): The subject of the email.
+            body (str): The HTML or plain text body of the email.
+
+        Returns:
+            bool: True if email was sent successfully, False otherwise.
+            str: A message indicating success or failure.
+        """
+        if not all([_HOST, _PORT, _SENDER_EMAIL]):
+            msg = "Error: SMTP configuration (HOST, PORT, SENDER_EMAIL) is incomplete in settings."
+            print(msg, file=sys.stderr)
+            return False, msg
+
+        # A single HTML part needs no multipart/alternative wrapper; switch to
+        # MIMEMultipart only if a plain-text alternative is ever added.
+        message = MIMEText(body, "html")
+        message["Subject"] = subject
+        message["From"] = _SENDER_EMAIL
+        message["To"] = recipient_email
+
+        with self._lock:
+            try:
+                if self.server is None:
+                    self._connect()
+
+                print(f"Sending email to: {recipient_email} from: {_SENDER_EMAIL}", file=sys.stderr)
+                try:
+                    self.server.send_message(message, _SENDER_EMAIL, recipient_email)
+                except smtplib.SMTPServerDisconnected:
+                    # The server may drop idle or long-lived connections; reconnect once and retry.
+                    print("SMTP connection was closed by the server. Reconnecting once...", file=sys.stderr)
+                    self.server = None
+                    self._connect()
+                    self.server.send_message(message, _SENDER_EMAIL, recipient_email)
+
+                success_msg = f"Email sent successfully to {recipient_email}."
+                print(success_msg) # Print success to stdout for user
+                return True, success_msg
+
+            except smtplib.SMTPAuthenticationError as e:
+                error_msg = f"SMTP Authentication Error for user {_USERNAME}: {e}"
+                print(error_msg, file=sys.stderr)
+                self._close()
+                return False, error_msg
+            except smtplib.SMTPServerDisconnected as e:
+                error_msg = f"SMTP Server Disconnected: {e}. Check server address ({_HOST}) and port ({_PORT})."
+                print(error_msg, file=sys.stderr)
+                self.server = None
+                return False, error_msg
+            except smtplib.SMTPConnectError as e:
+                error_msg = f"SMTP Connection Error: Could not connect to {_HOST}:{_PORT}. Error: {e}"
+                print(error_msg, file=sys.stderr)
+                self._close()
+                return False, error_msg
+            except smtplib.SMTPRecipientsRefused as e:
+                # Only this recipient was rejected; the connection is still usable for the rest of the batch.
+                error_msg = f"SMTP server refused recipient {recipient_email}: {e}"
+                print(error_msg, file=sys.stderr)
+                return False, error_msg
+            except Exception as e: # Catch-all for other smtplib errors or general errors
+                error_msg = f"An unexpected error occurred while sending email via {_HOST}: {e}"
+                print(error_msg, file=sys.stderr)
+                self._close()
+                return False, error_msg
+
 
 def send_email(recipient_email, subject, body):
     """
-    Sends an email using SMTP settings from config.py.
+    Sends a single email using SMTP settings from config.py.
+
+    Opens a connection just for this email; use SMTPSession to send a batch.
 
     Args:
         recipient_email (str): The email address of the recipient.
@@ -34,57 +166,8 @@ def send_email(recipient_email, subject, body):
         bool: True if email was sent successfully, False otherwise.
         str: A message indicating success or failure.
     """
-    if not all([settings.SMTP_HOST, settings.SMTP_PORT, settings.SMTP_SENDER_EMAIL]):
-        msg = "Error: SMTP configuration (HOST, PORT, SENDER_EMAIL) is incomplete in settings."
-        print(msg, file=sys.stderr)
-        return False, msg
-
-    message = MIMEMultipart("alternative")
-    message["Subject"] = subject
-    message["From"] = settings.SMTP_SENDER_EMAIL
-    message["To"] = recipient_email
-
-    html_part = MIMEText(body, "html")
-    message.attach(html_part)
-
-    try:
-        print(f"Attempting to connect to SMTP: {settings.SMTP_HOST}:{settings.SMTP_PORT}", file=sys.stderr)
-        if settings.SMTP_USE_TLS:
-            server = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=10) # Added timeout
-            server.ehlo()
-            server.starttls()
-            server.ehlo()
-        else:
-            server = smtplib.SMTP_SSL(settings.SMTP_HOST, settings.SMTP_PORT, timeout=10) # Added timeout
-
-        if settings.SMTP_USERNAME and settings.SMTP_PASSWORD:
-            print(f"Attempting SMTP login for user: {settings.SMTP_USERNAME}", file=sys.stderr)
-            server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
-
-        print(f"Sending email to: {recipient_email} from: {settings.SMTP_SENDER_EMAIL}", file=sys.stderr)
-        server.sendmail(settings.SMTP_SENDER_EMAIL, recipient_email, message.as_string())
-        server.quit()
-
-        success_msg = f"Email sent successfully to {recipient_email}."
-        print(success_msg) # Print success to stdout for user
-        return True, success_msg
-
-    except smtplib.SMTPAuthenticationError as e:
-        error_msg = f"SMTP Authentication Error for user {settings.SMTP_USERNAME}: {e}"
-        print(error_msg, file=sys.stderr)
-        return False, error_msg
-    except smtplib.SMTPServerDisconnected as e:
-        error_msg = f"SMTP Server Disconnected: {e}. Check server address ({settings.SMTP_HOST}) and port ({settings.SMTP_PORT})."
-        print(error_msg, file=sys.stderr)
-        return False, error_msg
-    except smtplib.SMTPConnectError as e:
-        error_msg = f"SMTP Connection Error: Could not connect to {settings.SMTP_HOST}:{settings.SMTP_PORT}. Error: {e}"
-        print(error_msg, file=sys.stderr)
-        return False, error_msg
-    except Exception as e: # Catch-all for other smtplib errors or general errors
-        error_msg = f"An unexpected error occurred while sending email via {settings.SMTP_HOST}: {e}"
-        print(error_msg, file=sys.stderr)
-        return False, error_msg
+    with SMTPSession() as session:
+        return session.send(recipient_email, subject, body)
 
 if __name__ == '__main__':
     print("--- Email Sender Test ---")
@@ -1,90 +1,502 @@
+import codecs
 import csv
+import functools
+import io
+import mmap
 import sys # For stderr
-import os # For __main__ part
+from concurrent.futures import ProcessPoolExecutor
+import logging # Per-row details, off unless DEBUG logging is enabled
+from collections import namedtuple
+import os # For file sizes and the __main__ part
+import importlib.util
 
-def extract_data_from_csv(file_path, email_col_options=None, company_col_options=None):
-    """
-    Reads a CSV file and extracts data from specified columns.
+# Optional fast paths for extract_data_from_csv: pandas' C parser, and pyarrow's multithreaded
+# parser for large files. Only checked for here and imported on first use, because importing
+# them adds ~90 MB and ~0.3 s to every process that loads this module (each app worker).
+_HAVE_PANDAS = importlib.util.find_spec("pandas") is not None
+_HAVE_PYARROW = importlib.util.find_spec("pyarrow") is not None
 
-    Args:
-        file_path (str): The path to the CSV file.
-        email_col_options (list or str): A list of possible column names for the email address.
-        company_col_options (list or str): A list of possible column names for the company name.
+@functools.lru_cache(maxsize=1)
+def _import_pandas():
+    """Imports pandas on first use and returns the module."""
+    import pandas
+    return pandas
 
-    Returns:
-        list: A list of dictionaries, where each dictionary contains
-              the extracted email and company name for a row.
-              Returns an empty list if required columns are not found or file fails to load.
-    """
+@functools.lru_cache(maxsize=1)
+def _import_pyarrow():
+    """Imports pyarrow on first use and returns (pyarrow, pyarrow.csv)."""
+    import pyarrow
+    from pyarrow import csv as pacsv
+    return pyarrow, pacsv
+
+READ_BUFFER_SIZE = 1 << 20 # 1 MiB reads instead of the default 8 KiB, so large files need far fewer read() calls
+ARROW_MIN_FILE_SIZE = 16 << 20 # Below ~16 MiB pyarrow's thread start-up costs more than it saves
+ARROW_BLOCK_SIZE = 8 << 20 # Each 8 MiB block is parsed on its own thread
+logger = logging.getLogger(__name__)
+
+# Compact row type for to_dict=False: a 2-tuple is about a quarter the size of a 2-key dict
+Entry = namedtuple('Entry', ('Email', 'CompanyName'))
+
+DEFAULT_EMAIL_COLUMNS = ["Email", "Email Address", "E-mail", "email", "Contact Email", "EmailID", "CONTACT_EMAIL"]
+DEFAULT_COMPANY_COLUMNS = ["Company Name", "Company", "Organization", "company_name", "Account Name", "CompanyName", "COMPANY_NAME"]
+
+def _normalize_options(email_col_options, company_col_options):
+    """Applies the default column names and wraps single names in a list."""
     if email_col_options is None:
-        email_col_options = ["Email", "Email Address", "E-mail", "email", "Contact Email", "EmailID", "CONTACT_EMAIL"]
+        email_col_options = DEFAULT_EMAIL_COLUMNS
     if company_col_options is None:
-        company_col_options = ["Company Name", "Company", "Organization", "company_name", "Account Name", "CompanyName", "COMPANY_NAME"]
+        company_col_options = DEFAULT_COMPANY_COLUMNS
 
     if isinstance(email_col_options, str):
         email_col_options = [email_col_options]
     if isinstance(company_col_options, str):
         company_col_options = [company_col_options]
+    return email_col_options, company_col_options
+
+@functools.lru_cache(maxsize=64)
+def _resolve_columns(header, email_col_options, company_col_options):
+    """
+    Finds the email and company columns in a CSV header.
+    Returns (email_idx, company_idx); either is None when no option matches.
+
+    Cached, so a batch of files sharing one schema resolves it once. All
+    arguments must be tuples so they can be hashed.
+    """
+    # Normalize header names once: strip spaces, lower case for matching
+    normalized_header = [name.strip().lower() for name in header]
+    if len(email_col_options) == 1 and len(company_col_options) == 1:
+        header_keys = normalized_header # One name each (e.g. passed as strings): a plain scan beats hashing every column
+    else:
+        header_keys = frozenset(normalized_header) # Membership only; the index is looked up on a hit
+    return (_resolve(email_col_options, normalized_header, header_keys),
+            _resolve(company_col_options, normalized_header, header_keys))
+
+def _resolve(options, normalized_header, header_keys):
+    """Returns the column index of the first option found in the header, or None."""
+    # Each option is normalized once, lazily, and only up to the first match
+    key = next((key for key in (option.strip().lower() for option in options) if key in header_keys), None)
+    if key is None:
+        return None
+    # Last occurrence: with duplicate header names the later column has always won
+    return len(normalized_header) - 1 - normalized_header[::-1].index(key)
+
+class _MmapReader(io.RawIOBase):
+    """Read-only raw stream over a memory-mapped file, so it can be wrapped in io.BufferedReader."""
+
+    def __init__(self, mm):
+        self._mm = mm
+        self._view = memoryview(mm)
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._mm)
+        self._pos = max(offset, 0)
+        return self._pos
+
+    def readinto(self, buffer):
+        data = self._view[self._pos:self._pos + len(buffer)] # A slice of the mapping, not a copy
+        n = len(data)
+        buffer[:n] = data
+        self._pos += n
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._view.release()
+            self._mm.close()
+        super().close()
+
+def _open_text(file_path, buffer_size, use_mmap):
+    """
+    Opens a CSV file for reading as text (UTF-8, BOM removed, newline='' for the csv module).
+
+    The file is opened in binary mode and a leading UTF-8 BOM is dropped once here,
+    so the text layer can use the plain utf-8 codec instead of utf-8-sig.
+
+    With use_mmap the file is memory-mapped and read straight from the page cache,
+    which helps when the same files are processed repeatedly. Files that can't be
+    mapped (e.g. empty files) are opened normally.
+    """
+    raw = None
+    if use_mmap:
+        try:
+            with open(file_path, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) # The mapping stays valid after the file is closed
+        except FileNotFoundError:
+            raise
+        except (ValueError, OSError):
+            pass # e.g. empty files can't be mapped; read them normally
+        else:
+            if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'): # Not on Windows
+                mm.madvise(mmap.MADV_SEQUENTIAL) # Read-ahead aggressively; we scan front to back once
+            raw = _MmapReader(mm)
+    if raw is None:
+        raw = open(file_path, 'rb', buffering=0)
 
-    extracted_data = []
     try:
-        with open(file_path, mode='r', encoding='utf-8-sig', newline='') as csvfile: # Added newline=''
-            reader = csv.DictReader(csvfile)
+        _skip_bom(raw)
+        # BufferedReader needs a positive size; treat 0 or less as "use the default", like open()
+        return io.TextIOWrapper(io.BufferedReader(raw, buffer_size if buffer_size > 0 else io.DEFAULT_BUFFER_SIZE),
+                                encoding='utf-8', newline='')
+    except Exception:
+        raw.close()
+        raise
 
-            actual_email_col = None
-            actual_company_col = None
+def _skip_bom(raw):
+    """Consumes a leading UTF-8 BOM from a seekable raw stream, or rewinds it if there is none."""
+    head = b""
+    while len(head) < len(codecs.BOM_UTF8): # Raw reads may return fewer bytes than asked for
+        chunk = raw.read(len(codecs.BOM_UTF8) - len(head))
+        if not chunk:
+            break
+        head += chunk
+    if head != codecs.BOM_UTF8:
+        raw.seek(0)
 
-            if not reader.fieldnames:
-                print(f"Error: CSV file {file_path} is empty or has no header.", file=sys.stderr)
-                return []
+def _process_rows(reader, email_idx, company_idx, to_dict, file_path, unique_emails=False):
+    """
+    Yields the extracted row for each CSV row from a csv.reader positioned after the header.
 
-            # Normalize fieldnames: strip spaces, lower case for matching, but keep original for access
-            normalized_fieldnames_map = {name.strip().lower(): name for name in reader.fieldnames}
+    This is the per-row hot loop of the csv path. It is kept apart from the file
+    and header handling so it can be profiled, or replaced by a compiled version,
+    on its own.
 
-            for option in email_col_options:
-                if option.strip().lower() in normalized_fieldnames_map:
-                    actual_email_col = normalized_fieldnames_map[option.strip().lower()]
-                    break
+    Args:
+        reader: A csv.reader over the data rows.
+        email_idx (int): Index of the email column.
+        company_idx (int or None): Index of the company column, or None if the file has none.
+        to_dict (bool): Yield dicts if True, Entry tuples otherwise.
+        file_path (str): The file being read, for log messages.
+        unique_emails (bool): Skip rows whose email (compared case-insensitively) was already seen.
+    """
+    # Bind names used on every row to locals, saving the global/attribute lookups per row
+    log_debug = logger.debug
+    strip = str.strip
+    lower = str.lower
+    skipped = 0
+    duplicates = 0
+    seen = set() if unique_emails else None
+    seen_add = seen.add if unique_emails else None
+
+    for row_number, row in enumerate(reader, 1): # Start row_number from 1 for user messages
+        if not row: # Blank line
+            continue
+        # csv.reader only yields str, so one strip and a truthiness check cover missing,
+        # empty and blank emails. Short rows lack trailing columns.
+        email = strip(row[email_idx]) if email_idx < len(row) else ""
+        if not email:
+            # Lazy %-formatting: nothing is built unless DEBUG logging is on
+            log_debug("Skipping row %d of %s due to missing or invalid email.", row_number, file_path)
+            skipped += 1
+            continue
+        if seen is not None:
+            key = lower(email)
+            if key in seen:
+                duplicates += 1
+                continue
+            seen_add(key)
+
+        company_name_to_store = "N/A" # Default
+        if company_idx is not None and company_idx < len(row): # Column identified and present in this row
+            company_name_from_row = strip(row[company_idx]) # Strip once
+            if company_name_from_row:
+                company_name_to_store = company_name_from_row
 
-            for option in company_col_options:
-                if option.strip().lower() in normalized_fieldnames_map:
-                    actual_company_col = normalized_fieldnames_map[option.strip().lower()]
-                    break
+        if to_dict:
+            yield {
+                "Email": email,
+                "Company Name": company_name_to_store
+            }
+        else:
+            yield Entry(email, company_name_to_store)
 
-            if not actual_email_col:
-                print(f"Error: Email column (one of {email_col_options}) not found in CSV header: {reader.fieldnames}", file=sys.stderr)
-                return []
+    if skipped: # One summary line instead of one print per bad row
+        print(f"Info: Skipped {skipped} rows due to missing or invalid email.", file=sys.stderr)
+    if duplicates:
+        _report_duplicates(duplicates, len(seen))
 
-            if not actual_company_col:
-                print(f"Warning: Company column (one of {company_col_options}) not found in CSV header: {reader.fieldnames}. Proceeding with email only.", file=sys.stderr)
+def _report_duplicates(duplicates, unique):
+    """Prints the summary line for rows dropped by unique_emails."""
+    print(f"Info: Skipped {duplicates} rows with duplicate emails; {unique} unique emails kept.", file=sys.stderr)
 
-            for row_number, row in enumerate(reader, 1): # Start row_number from 1 for user messages
-                email = row.get(actual_email_col)
+def iter_data_from_csv(file_path, email_col_options=None, company_col_options=None, buffer_size=READ_BUFFER_SIZE, to_dict=True, use_mmap=False, unique_emails=False):
+    """
+    Reads a CSV file and yields the extracted data one row at a time.
+
+    Rows are parsed as they are consumed, so callers can start working on the first
+    contacts before the whole file is read and memory stays flat for large files.
 
-                company_name_to_store = "N/A" # Default
-                if actual_company_col: # Only try to get company name if column was identified
-                    company_name_from_row = row.get(actual_company_col)
-                    if company_name_from_row is not None and str(company_name_from_row).strip(): # Check if not None and not empty string after strip
-                        company_name_to_store = str(company_name_from_row).strip()
+    Args:
+        file_path (str): The path to the CSV file.
+        email_col_options (list or str): A list of possible column names for the email address.
+        company_col_options (list or str): A list of possible column names for the company name.
+        buffer_size (int): Size in bytes of the file read buffer. Defaults to 1 MiB; 0 or less uses io.DEFAULT_BUFFER_SIZE.
+        to_dict (bool): Return {"Email", "Company Name"} dicts (the default) or, if False, Entry tuples.
+        use_mmap (bool): Read the file through a memory map instead of buffered reads.
+        unique_emails (bool): Skip rows whose email (compared case-insensitively) already appeared.
 
-                if not email or not isinstance(email, str) or not email.strip():
-                    print(f"Info: Skipping row {row_number} due to missing or invalid email.", file=sys.stderr)
-                    continue
+    Yields:
+        dict or Entry: The extracted email and company name for a row.
+              Yields nothing if the file can't be opened, or its header can't be read
+              or lacks the email column.
 
-                data_entry = {
-                    "Email": email.strip(),
-                    "Company Name": company_name_to_store
-                }
-                extracted_data.append(data_entry)
+    Raises:
+        Exception: Any error reading the data rows (e.g. UnicodeDecodeError, csv.Error)
+            is raised to the caller rather than ending the stream early.
+    """
+    email_col_options, company_col_options = _normalize_options(email_col_options, company_col_options)
 
+    # Problems opening the file or reading its header mean there is nothing to yield:
+    # report them and stop. Once data rows are flowing, read errors (e.g. invalid
+    # UTF-8 halfway through) propagate, so callers don't mistake a partial read for
+    # the whole file.
+    try:
+        csvfile = _open_text(file_path, buffer_size, use_mmap)
     except FileNotFoundError:
         print(f"Error: File not found at {file_path}", file=sys.stderr)
-        return []
+        return
     except Exception as e:
         print(f"Error reading CSV file {file_path}: {e}", file=sys.stderr)
-        return []
+        return
+
+    with csvfile:
+        # Plain csv.reader: rows are lists indexed by column position, which avoids
+        # building a dict (and hashing every header) for every row.
+        reader = csv.reader(csvfile)
+        try:
+            header = next(reader, None)
+        except Exception as e:
+            print(f"Error reading CSV file {file_path}: {e}", file=sys.stderr)
+            return
 
-    return extracted_data
+        if not header:
+            print(f"Error: CSV file {file_path} is empty or has no header.", file=sys.stderr)
+            return
+
+        email_idx, company_idx = _resolve_columns(tuple(header), tuple(email_col_options), tuple(company_col_options))
+
+        if email_idx is None:
+            print(f"Error: Email column (one of {email_col_options}) not found in CSV header: {header}", file=sys.stderr)
+            return
+
+        if company_idx is None:
+            print(f"Warning: Company column (one of {company_col_options}) not found in CSV header: {header}. Proceeding with email only.", file=sys.stderr)
+
+        yield from _process_rows(reader, email_idx, company_idx, to_dict, file_path, unique_emails)
+
+def _entries_from_columns(emails, companies, to_dict, unique_emails=False, soa=False):
+    """
+    Builds the extracted rows from whole columns, as the fast paths read them.
+
+    Stripping, the empty-email filter and the "N/A" default run as vectorized
+    string operations over each column instead of once per row in Python.
+
+    Args:
+        emails (pandas.Series): The raw email column.
+        companies (pandas.Series or None): The raw company column, or None if the file has none.
+        to_dict (bool): Build dicts if True, Entry tuples otherwise.
+        unique_emails (bool): Keep only the first row for each email, compared case-insensitively.
+        soa (bool): Return the two cleaned columns as lists instead of one entry per row.
+
+    Returns:
+        list or dict: The stripped email and company name of each row that has an email,
+                      or {"Email": [...], "Company Name": [...]} if soa is True.
+    """
+    emails = emails.str.strip()
+    keep = emails != ""
+    skipped = int((~keep).sum())
+    if skipped:
+        print(f"Info: Skipped {skipped} rows due to missing or invalid email.", file=sys.stderr)
+    if unique_emails:
+        duplicate = emails.str.lower().duplicated() & keep # Blank emails are already dropped
+        duplicates = int(duplicate.sum())
+        if duplicates:
+            keep &= ~duplicate
+            _report_duplicates(duplicates, int(keep.sum()))
+
+    emails = emails[keep].tolist()
+    if companies is None:
+        companies = ["N/A"] * len(emails)
+    else:
+        companies = companies[keep].str.strip()
+        companies = companies.where(companies != "", "N/A").tolist()
+    if soa:
+        return {"Email": emails, "Company Name": companies}
+    if not to_dict:
+        return list(map(Entry, emails, companies))
+    return [{"Email": email, "Company Name": company} for email, company in zip(emails, companies)]
+
+def _file_size(file_path):
+    """Returns the size of a file in bytes, or 0 if it can't be read."""
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return 0
+
+def _extract_with_pyarrow(file_path, email_col_options, company_col_options, to_dict, unique_emails, soa):
+    """
+    Fast path for large files using pyarrow's multithreaded CSV reader.
+
+    Only the email and company columns are converted. Returns None when the
+    file can't be handled here (missing header or columns, ragged rows, other
+    parser errors), so the caller falls back to a slower path.
+    """
+    try:
+        with open(file_path, mode='r', encoding='utf-8-sig', newline='') as csvfile:
+            header = next(csv.reader(csvfile), None)
+        if not header:
+            return None
+        email_idx, company_idx = _resolve_columns(tuple(header), tuple(email_col_options), tuple(company_col_options))
+        if email_idx is None:
+            return None
+
+        pa, pacsv = _import_pyarrow()
+        # Positional names, so duplicate or odd header names can't clash. pyarrow skips the BOM itself.
+        column_names = [f"c{i}" for i in range(len(header))]
+        email_col = column_names[email_idx]
+        include_columns = [email_col] if company_idx is None else [email_col, column_names[company_idx]]
+        table = pacsv.read_csv(
+            file_path,
+            read_options=pacsv.ReadOptions(skip_rows=1, column_names=column_names, block_size=ARROW_BLOCK_SIZE),
+            # Lets the file be split into blocks at any newline; a quoted value spanning
+            # two blocks makes the parse fail, and the caller then falls back.
+            parse_options=pacsv.ParseOptions(newlines_in_values=False),
+            convert_options=pacsv.ConvertOptions(include_columns=include_columns,
+                                                 column_types={c: pa.string() for c in include_columns}))
+    except FileNotFoundError:
+        return None # Reported by the csv path
+    except Exception as e:
+        print(f"Info: pyarrow could not parse {file_path} ({e}); falling back.", file=sys.stderr)
+        return None
+
+    # Arrow string columns convert to pandas without copying the character data
+    emails = table.column(email_col).to_pandas()
+    companies = table.column(include_columns[-1]).to_pandas() if company_idx is not None else None
+    return _entries_from_columns(emails, companies, to_dict, unique_emails, soa)
+
+def _extract_with_pandas(file_path, email_col_options, company_col_options, to_dict, unique_emails, soa):
+    """
+    Fast path for extract_data_from_csv using pandas' C parser.
+
+    Only the email and company columns are parsed, and stripping/filtering runs
+    on whole columns instead of row by row. Returns None when the file can't be
+    handled here (missing header or columns, parser errors), so the caller falls
+    back to the csv module, which also reports the problem.
+    """
+    try:
+        with open(file_path, mode='r', encoding='utf-8-sig', newline='') as csvfile:
+            header = next(csv.reader(csvfile), None)
+        if not header:
+            return None
+        email_idx, company_idx = _resolve_columns(tuple(header), tuple(email_col_options), tuple(company_col_options))
+        if email_idx is None:
+            return None
+
+        pd = _import_pandas()
+        usecols = [email_idx] if company_idx is None else sorted({email_idx, company_idx})
+        # Everything as plain strings: no NaN detection or type inference, like the csv module
+        df = pd.read_csv(file_path, usecols=usecols, dtype=str, keep_default_na=False, na_filter=False, encoding='utf-8-sig')
+    except FileNotFoundError:
+        return None # Reported by the csv path
+    except Exception as e:
+        print(f"Info: pandas could not parse {file_path} ({e}); falling back to the csv module.", file=sys.stderr)
+        return None
+
+    emails = df.iloc[:, usecols.index(email_idx)]
+    companies = df.iloc[:, usecols.index(company_idx)] if company_idx is not None else None
+    return _entries_from_columns(emails, companies, to_dict, unique_emails, soa)
+
+def extract_data_from_csv(file_path, email_col_options=None, company_col_options=None, buffer_size=READ_BUFFER_SIZE, to_dict=True, use_mmap=False, unique_emails=False, soa=False):
+    """
+    Reads a CSV file and extracts data from specified columns.
+
+    Uses pyarrow for files of ARROW_MIN_FILE_SIZE and up and pandas otherwise,
+    when they are installed, and falls back to the csv module. Passing use_mmap
+    or a non-default buffer_size always reads with the csv module.
+
+    The whole result is held in memory. Callers that handle each row once (e.g.
+    sending a batch) or read files with millions of rows should use
+    iter_data_from_csv instead, which keeps memory flat.
+
+    Args:
+        file_path (str): The path to the CSV file.
+        email_col_options (list or str): A list of possible column names for the email address.
+        company_col_options (list or str): A list of possible column names for the company name.
+        buffer_size (int): Size in bytes of the file read buffer. Defaults to 1 MiB; 0 or less uses io.DEFAULT_BUFFER_SIZE.
+        to_dict (bool): Return {"Email", "Company Name"} dicts (the default) or, if False, Entry tuples.
+        use_mmap (bool): Memory-map the file when it is read with the csv module.
+        unique_emails (bool): Keep only the first row for each email, compared case-insensitively.
+        soa (bool): Return {"Email": [...], "Company Name": [...]}, one list per column,
+            instead of one entry per row. Overrides to_dict.
+
+    Returns:
+        list: A list of dictionaries (or Entry tuples if to_dict is False), each
+              containing the extracted email and company name for a row.
+              Returns an empty list if the file can't be opened, or its header can't be
+              read or lacks the email column.
+              With soa, a dict of two equally long lists instead (empty in those cases).
+
+    Raises:
+        Exception: Any error reading the data rows (e.g. UnicodeDecodeError, csv.Error),
+            so a damaged file never comes back as a partial list.
+    """
+    email_col_options, company_col_options = _normalize_options(email_col_options, company_col_options)
+    # use_mmap and buffer_size only apply to the csv module's reader, so asking for either goes straight to it
+    use_fast_paths = not use_mmap and buffer_size == READ_BUFFER_SIZE
+    if use_fast_paths and _HAVE_PYARROW and _HAVE_PANDAS and _file_size(file_path) >= ARROW_MIN_FILE_SIZE:
+        data = _extract_with_pyarrow(file_path, email_col_options, company_col_options, to_dict, unique_emails, soa)
+        if data is not None:
+            return data
+    if use_fast_paths and _HAVE_PANDAS:
+        data = _extract_with_pandas(file_path, email_col_options, company_col_options, to_dict, unique_emails, soa)
+        if data is not None:
+            return data
+    if not soa:
+        return list(iter_data_from_csv(file_path, email_col_options, company_col_options, buffer_size, to_dict, use_mmap, unique_emails))
+
+    # Column lists: each row's Entry is freed right away, so only the two lists stay in memory
+    emails = []
+    companies = []
+    emails_append = emails.append
+    companies_append = companies.append
+    for email, company in iter_data_from_csv(file_path, email_col_options, company_col_options, buffer_size, False, use_mmap, unique_emails):
+        emails_append(email)
+        companies_append(company)
+    return {"Email": emails, "Company Name": companies}
+
+def extract_data_from_csv_batch(paths, workers=None, **kwargs):
+    """
+    Extracts data from several CSV files in parallel, one file per worker process.
+
+    Processes rather than threads, because parsing and building the rows is
+    CPU-bound Python work that the GIL would otherwise serialize. Each result is
+    pickled back to the caller, so this pays off for several large files on a
+    multi-core machine; a single file is read in-process.
+
+    Args:
+        paths (list): Paths of the CSV files to read.
+        workers (int): Number of worker processes. Defaults to the number of CPUs.
+        **kwargs: Passed on to extract_data_from_csv (column options, to_dict, ...).
+
+    Returns:
+        dict: Maps each path to the list extract_data_from_csv returned for it, in the order given.
+    """
+    paths = list(paths)
+    extract = functools.partial(extract_data_from_csv, **kwargs) # A partial of a module function pickles fine
+    if len(paths) < 2 or workers == 1: # Nothing to overlap; skip the process start-up and pickling
+        return {path: extract(path) for path in paths}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # One file per task: files are big units of work, and batching them would leave workers idle
+        return dict(zip(paths, executor.map(extract, paths)))
 
 if __name__ == "__main__":
     # This test part won't run in the subtask if pip fails earlier,
@@ -0,0 +1,14 @@
+# Gunicorn settings for serving the app outside Flask's development server.
+# Usage: gunicorn -c gunicorn_conf.py app:app
+import multiprocessing
+
+bind = '0.0.0.0:8080'
+
+# The app spends almost all its time waiting on Gemini and SMTP, so gevent workers
+# let each process keep many requests (and their sends) in flight at once.
+worker_class = 'gevent'
+workers = multiprocessing.cpu_count() * 2 + 1
+worker_connections = 1000
+
+# A large upload is processed within a single request; give it time to finish.
+timeout = 300